@@ -1,5 +1,116 @@
+import json
+import logging
+import threading
+import time
 import requests
-from typing import Optional 
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# orjson serializes straight to UTF-8 bytes and is much faster than stdlib json;
+# fall back to json if it isn't installed
+try:
+    import orjson
+
+    def _dumps(payload: dict) -> bytes:
+        return orjson.dumps(payload)
+except ImportError:
+    def _dumps(payload: dict) -> bytes:
+        return json.dumps(payload).encode('utf-8')
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+log = logging.getLogger(__name__)
+
+# Discord's limit on embeds in a single webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+
+# Embed colour per reminder stage
+_STAGE_COLOR = {
+    "1440": 0x00FF00,  # Green for early reminder
+    "60": 0x00FF00,
+    "30": 0x00FF00,
+    "15": 0xFFA500,    # Orange for upcoming
+    "5": 0xFF0000,     # Red for urgent
+}
+
+# Retry transient failures inside the connection pool with exponential backoff.
+# For 429s urllib3 sleeps for Discord's Retry-After header instead.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.25,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["POST"]),
+    respect_retry_after_header=True
+)
+
+# Shared session so webhook calls reuse keep-alive connections instead of
+# doing a fresh TCP + TLS handshake for every reminder
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY))
+
+# (connect, read) timeouts so a stalled webhook can't block the reminder loop
+_TIMEOUT = (3, 10)
+
+# Background workers for fire-and-forget sends (see send_async)
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# Client-side token bucket per webhook - Discord allows ~5 requests per 2s,
+# so pacing ourselves avoids bursts of 429s (and their retries) at drop time
+_BUCKET_CAPACITY = 5
+_BUCKET_RATE = 5 / 2.0  # tokens refilled per second
+_BUCKETS: Dict[str, Tuple[float, float]] = {}  # webhook_url -> (tokens, last_refill)
+_BUCKETS_LOCK = threading.Lock()
+
+def _take_token(webhook_url: str) -> None:
+    """
+    Block until the webhook's bucket has a token, then consume it.
+    A last_refill in the future means the server told us to hold off until then.
+    """
+    while True:
+        with _BUCKETS_LOCK:
+            now = time.monotonic()
+            tokens, last = _BUCKETS.get(webhook_url, (_BUCKET_CAPACITY, now))
+            if now > last:
+                tokens = min(_BUCKET_CAPACITY, tokens + (now - last) * _BUCKET_RATE)
+                last = now
+            if tokens >= 1:
+                _BUCKETS[webhook_url] = (tokens - 1, last)
+                return
+            _BUCKETS[webhook_url] = (tokens, last)
+            wait = (last - now) + (1 - tokens) / _BUCKET_RATE
+        time.sleep(wait)
+
+def _sync_bucket(webhook_url: str, response: requests.Response) -> None:
+    """
+    Update the webhook's bucket from Discord's X-RateLimit-* headers.
+    Keeps our local estimate in line with the server's view of the bucket.
+    """
+    try:
+        remaining = float(response.headers["X-RateLimit-Remaining"])
+        reset_after = float(response.headers["X-RateLimit-Reset-After"])
+    except (KeyError, ValueError):
+        return  # Headers missing or malformed, keep local estimate
+
+    with _BUCKETS_LOCK:
+        now = time.monotonic()
+        if remaining >= 1:
+            _BUCKETS[webhook_url] = (min(_BUCKET_CAPACITY, remaining), now)
+        else:
+            # Empty - first token becomes available exactly when the bucket resets
+            _BUCKETS[webhook_url] = (0.0, now + reset_after - 1 / _BUCKET_RATE)
+
+def _post(webhook_url: str, body: bytes) -> requests.Response:
+    """
+    POST an encoded JSON body to a webhook through the shared session, respecting rate limits.
+    429s are retried by the session's Retry policy using Discord's Retry-After.
+    """
+    _take_token(webhook_url)
+    response = _SESSION.post(webhook_url, data=body, headers=_JSON_HEADERS, timeout=_TIMEOUT)
+    _sync_bucket(webhook_url, response)
+    return response
 
 def send_notif(webhook_url: str, message: str, title: Optional[str] = None, url: Optional[str] = None) -> bool:
     """
@@ -31,20 +142,20 @@ def send_notif(webhook_url: str, message: str, title: Optional[str] = None, url:
             "content": content
         }
 
-        print(f"Sending notification to Discord webhook... {title or 'Message'}")
+        log.debug("Sending notification to Discord webhook... %s", title or 'Message')
 
         # POST to webhook URL
-        response = requests.post(webhook_url, json=payload)
+        response = _post(webhook_url, _dumps(payload))
         response.raise_for_status()  # Raise error for bad responses
 
-        print("Notification sent successfully.")
+        log.debug("Notification sent successfully.")
         return True
     
     except requests.exceptions.RequestException as e:
-        print(f"Error sending notification: {e}")
+        log.error("Error sending notification: %s", e)
         return False
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        log.error("Unexpected error: %s", e)
         return False
 
 def send_discord_embed(webhook_url: str, title: str, description: str, url: Optional[str] = None, color: int = 0x00ff00, fields: Optional[list] = None, image_url: Optional[str] = None, thumbnail_url: Optional[str] = None) -> bool:
@@ -64,51 +175,82 @@ def send_discord_embed(webhook_url: str, title: str, description: str, url: Opti
         True if sent successfully, False otherwise
     """
     try:
-        # Build the embed structure
-        embed = {
-            "title": title,
-            "description": description,
-            "color": color,  # Left border color (0x00ff00 = green, 0xff0000 = red, etc.)
-        }
-        
-        if url:
-            embed["url"] = url
-        
-        # Add custom fields (shown as Name: Value pairs)
-        if fields:
-            embed["fields"] = fields
-        
-        # Add images if provided
-        if image_url:
-            embed["image"] = {"url": image_url}
-        if thumbnail_url:
-            embed["thumbnail"] = {"url": thumbnail_url}
-        
-        # Discord webhook payload with embeds
-        payload = {
-            "embeds": [embed]
-        }
-        
-        print(f"Sending Discord embed: {title}")
+        body = _dumps(_embed_payload(title, description, url, color, fields, image_url, thumbnail_url))
+    except Exception as e:
+        log.error("Unexpected error sending Discord embed: %s", e)
+        return False
+    return _send_embed(webhook_url, title, body)
+
+def _embed_payload(title: str, description: str, url: Optional[str], color: int, fields: Optional[list], image_url: Optional[str], thumbnail_url: Optional[str]) -> dict:
+    """
+    Build the webhook payload for a single embed (see send_discord_embed for args).
+    """
+    # Build the embed structure
+    embed = {
+        "title": title,
+        "description": description,
+        "color": color,  # Left border color (0x00ff00 = green, 0xff0000 = red, etc.)
+    }
+    
+    if url:
+        embed["url"] = url
+    
+    # Add custom fields (shown as Name: Value pairs)
+    if fields:
+        embed["fields"] = fields
+    
+    # Add images if provided
+    if image_url:
+        embed["image"] = {"url": image_url}
+    if thumbnail_url:
+        embed["thumbnail"] = {"url": thumbnail_url}
+    
+    # Discord webhook payload with embeds
+    return {
+        "embeds": [embed]
+    }
+
+def _send_embed(webhook_url: str, title: str, body: bytes) -> bool:
+    """
+    POST an already-encoded embed payload. title is only used for logging.
+
+    Returns:
+        True if sent successfully, False otherwise
+    """
+    try:
+        log.debug("Sending Discord embed: %s", title)
         
         # POST to webhook URL
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = _post(webhook_url, body)
         response.raise_for_status()
-        print("✓ Discord embed sent successfully")
+        log.debug("✓ Discord embed sent successfully")
         return True
         
     except requests.RequestException as e:
-        print(f"Discord embed failed: {e}")
+        log.error("Discord embed failed: %s", e)
         return False
     except Exception as e:
-        print(f"Unexpected error sending Discord embed: {e}")
+        log.error("Unexpected error sending Discord embed: %s", e)
         return False
 
-    
-def send_reminder(webhook_url: str, sneaker_name: str, brand: str, drop_time: str, minutes_left: int, url: Optional[str] = None, image_url: Optional[str] = None) -> bool:
+
+@lru_cache(maxsize=512)
+def _drop_fields(brand: str, drop_time: str) -> Tuple[dict, dict]:
+    """
+    Build the Brand / Drop Time embed fields for a drop.
+    Cached because they're identical for every reminder stage of the same drop.
+    The returned dicts are shared between calls, so treat them as read-only.
+    """
+    return (
+        {"name": "Brand", "value": brand, "inline": True},
+        {"name": "Drop Time", "value": drop_time, "inline": True},
+    )
+
+def send_reminder(webhook_url: str, sneaker_name: str, brand: str, drop_time: str, minutes_left: int, url: Optional[str] = None, image_url: Optional[str] = None, stage: Optional[str] = None) -> bool:
     """
     Send a formatted drop reminder to Discord.
-    Helper function that wraps send_discord_embed with sneaker-specific formatting 
+    Same embed format as send_discord_embed with sneaker-specific formatting;
+    the encoded payload is cached so every subscriber to a drop reuses it
 
     Args:
         webhook_url: Discord webhook URL
@@ -118,12 +260,30 @@ def send_reminder(webhook_url: str, sneaker_name: str, brand: str, drop_time: st
         minutes_left: How many minutes until drop
         url: Optional link to purchase page
         image_url: Optional image URL for sneaker thumbnail
+        stage: Optional reminder stage ("1440", "60", "30", "15", "5") used to pick the colour
     
     Returns:
         True if sent successfully, False otherwise
     """
-    # Choose colour based on urgency 
-    if minutes_left <= 5:
+    title = f"🚨 Sneaker Drop Reminder ({minutes_left} min)"
+    try:
+        body = _reminder_body(sneaker_name, brand, drop_time, minutes_left, url, image_url, stage)
+    except Exception as e:
+        log.error("Unexpected error sending Discord embed: %s", e)
+        return False
+    return _send_embed(webhook_url, title, body)
+
+@lru_cache(maxsize=256)
+def _reminder_embed(sneaker_name: str, brand: str, drop_time: str, minutes_left: int, url: Optional[str], image_url: Optional[str], stage: Optional[str]) -> dict:
+    """
+    Build a reminder embed once per (drop, minutes left, stage).
+    Every subscriber to a drop gets the same reminder at the same stage, so
+    repeats reuse the cached embed. Shared between calls - treat as read-only.
+    """
+    # Choose colour based on urgency (direct lookup when the stage is known)
+    if stage in _STAGE_COLOR:
+        color = _STAGE_COLOR[stage]
+    elif minutes_left <= 5:
         color = 0xFF0000  # Red for urgent
     elif minutes_left <= 15:
         color = 0xFFA500  # Orange for upcoming
@@ -133,23 +293,96 @@ def send_reminder(webhook_url: str, sneaker_name: str, brand: str, drop_time: st
     # Build descrption 
     description = f"🔥 **{sneaker_name}** drops in **{minutes_left} minutes**!"
 
-    # Build fields for structured info
+    # Build fields for structured info (Brand/Drop Time are shared per drop)
     fields = [
-        {"name": "Brand", "value": brand, "inline": True},
-        {"name": "Drop Time", "value": drop_time, "inline": True},
+        *_drop_fields(brand, drop_time),
         {"name": "Minutes Left", "value": f"⏰ {minutes_left} min", "inline": True}
     ]
 
-    # Call generic embed sender with image support
-    return send_discord_embed(
-        webhook_url=webhook_url,
-        title=f"🚨 Sneaker Drop Reminder ({minutes_left} min)",
-        description=description,
-        url=url,
-        color=color,
-        fields=fields,
-        image_url=image_url
-    )
+    title = f"🚨 Sneaker Drop Reminder ({minutes_left} min)"
+    return _embed_payload(title, description, url, color, fields, image_url, None)["embeds"][0]
+
+@lru_cache(maxsize=256)
+def _reminder_body(*args) -> bytes:
+    """
+    Encoded single-embed payload for a reminder (same args as _reminder_embed).
+    """
+    return _dumps({"embeds": [_reminder_embed(*args)]})
+
+def send_async(send_fn: Callable[..., bool], *args, **kwargs) -> Future:
+    """
+    Queue any of the send_* functions on the background thread pool.
+    Lets callers fire many webhooks at once and gather the results later.
+
+    Args:
+        send_fn: Notification function to run (send_notif, send_reminder, etc.)
+        *args, **kwargs: Passed straight through to send_fn
+
+    Returns:
+        Future resolving to send_fn's True/False result
+    """
+    return _EXECUTOR.submit(send_fn, *args, **kwargs)
+
+def send_reminder_async(*args, **kwargs) -> Future:
+    """
+    Queue send_reminder on the background thread pool.
+    Takes the same arguments as send_reminder and returns immediately.
+
+    Returns:
+        Future resolving to True if sent successfully, False otherwise
+    """
+    return send_async(send_reminder, *args, **kwargs)
+
+def send_reminder_batch(reminders: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Send many reminders as multi-embed webhook messages.
+    Discord allows up to 10 embeds per message, so a burst of N reminders
+    becomes ~N/10 POSTs (run in parallel on the thread pool) instead of N.
+
+    Args:
+        reminders: One dict of send_reminder keyword arguments per reminder
+                   (webhook_url, sneaker_name, brand, drop_time, minutes_left, ...)
+
+    Returns:
+        Success flag per reminder, in the same order. Every reminder in a
+        message shares that message's result.
+    """
+    # Group by webhook, then split each group into messages
+    by_webhook: Dict[str, List[int]] = {}
+    for i, reminder in enumerate(reminders):
+        by_webhook.setdefault(reminder['webhook_url'], []).append(i)
+
+    queued = []
+    for webhook_url, indexes in by_webhook.items():
+        for start in range(0, len(indexes), MAX_EMBEDS_PER_MESSAGE):
+            chunk = indexes[start:start + MAX_EMBEDS_PER_MESSAGE]
+            future = send_async(_send_reminder_chunk, webhook_url, [reminders[i] for i in chunk])
+            queued.append((chunk, future))
+
+    results = [False] * len(reminders)
+    for chunk, future in queued:
+        success = future.result()
+        for i in chunk:
+            results[i] = success
+    return results
+
+def _send_reminder_chunk(webhook_url: str, reminders: List[Dict[str, Any]]) -> bool:
+    """
+    POST up to MAX_EMBEDS_PER_MESSAGE reminders as one webhook message.
+    """
+    try:
+        embeds = [
+            _reminder_embed(
+                r['sneaker_name'], r['brand'], r['drop_time'], r['minutes_left'],
+                r.get('url'), r.get('image_url'), r.get('stage')
+            )
+            for r in reminders
+        ]
+        body = _dumps({"embeds": embeds})
+    except Exception as e:
+        log.error("Unexpected error sending Discord embed: %s", e)
+        return False
+    return _send_embed(webhook_url, f"{len(embeds)} drop reminder(s)", body)
 
 def send_1day_reminder(webhook_url: str, sneaker_name: str, brand: str, drop_time: str, url: Optional[str] = None, image_url: Optional[str] = None) -> bool:
     """
@@ -173,10 +406,9 @@ def send_1day_reminder(webhook_url: str, sneaker_name: str, brand: str, drop_tim
     # Build description for 1-day reminder
     description = f"📅 **{sneaker_name}** drops **tomorrow** at {drop_time}!"
     
-    # Build fields for structured info
+    # Build fields for structured info (Brand/Drop Time are shared per drop)
     fields = [
-        {"name": "Brand", "value": brand, "inline": True},
-        {"name": "Drop Time", "value": drop_time, "inline": True},
+        *_drop_fields(brand, drop_time),
         {"name": "Time Left", "value": "📅 ~24 hours", "inline": True}
     ]
     
@@ -191,6 +423,13 @@ def send_1day_reminder(webhook_url: str, sneaker_name: str, brand: str, drop_tim
         image_url=image_url
     )
 
+def send_1day_reminder_async(*args, **kwargs) -> Future:
+    """
+    Queue send_1day_reminder on the background thread pool.
+    Takes the same arguments as send_1day_reminder and returns immediately.
+    """
+    return send_async(send_1day_reminder, *args, **kwargs)
+
 def main():
     """
     Demo of notification functions.
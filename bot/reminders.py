@@ -1,14 +1,44 @@
+import logging
+from concurrent.futures import Future, wait
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-from typing import List, Dict, Any, Tuple, Callable
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Callable
 import sys
 from pathlib import Path
 
-# Add parent directory to path to be able to import storage
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+# Running as a script: add the project root to the path so the bot package imports
+if __name__ == '__main__':
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from bot.storage import load_drops, load_subs, save_subs 
+from bot.tz import TARGET_TZ
+
+log = logging.getLogger(__name__)
+
+# Max seconds to wait for queued (async) sends to start at the end of a pass.
+# Sends still queued after this are cancelled and retried next check; ones
+# already in flight are waited out (the HTTP session's timeouts bound them)
+SEND_TIMEOUT = 30
+
+# Reminder stages in minutes before the drop (largest first)
+STAGES = ("1440", "60", "30", "15", "5")
+
+# (minutes, stage) pairs, most urgent first
+_STAGES_ASC = tuple((int(stage), stage) for stage in reversed(STAGES))
 
-TARGET_TZ = ZoneInfo("America/Toronto")
+# Most urgent reached stage for every minutes-left value up to the first stage,
+# so due_stages is a single tuple index instead of a scan over the stages
+_STAGE_BY_MINUTE = tuple(
+    next(stage for minutes, stage in _STAGES_ASC if m <= minutes)
+    for m in range(int(STAGES[0]) + 1)
+)
+
+# Furthest ahead of a drop (in seconds) that any stage can be due
+REMINDER_HORIZON_SECONDS = (int(STAGES[0]) + 1) * 60
+
+# Seconds-before-drop range that can contain a due stage, used to skip
+# subscriptions cheaply before doing any datetime work
+_WINDOW_MIN = 0
+_WINDOW_MAX = REMINDER_HORIZON_SECONDS
 
 def due_stages(now: datetime, drop_dt: datetime) -> List[str]:
     """
@@ -22,41 +52,128 @@ def due_stages(now: datetime, drop_dt: datetime) -> List[str]:
         List of stage names that are due: ["1440"], ["60"], ["30"], ["15"], ["5"], or []
     
     Time math logic:
-    - T-1440: Between 24-25 hours before drop (1 day)
-    - T-60: Between 60-61 minutes before drop (1 hour)
-    - T-30: Between 30-31 minutes before drop
-    - T-15: Between 15-16 minutes before drop  
-    - T-5: Between 5-6 minutes before drop
-    - Uses 1-minute windows to avoid duplicate sends
+    - A stage is due once the drop is within that many minutes (T-1440, T-60, T-30, T-15, T-5)
+    - Only the most urgent reached stage is returned, so a late or missed tick
+      catches up with the latest reminder instead of skipping it
+    - process_reminders checks reminders_sent, so each stage is still sent once
+    """
+    return due_stages_epoch(int(now.timestamp()), int(drop_dt.timestamp()))
+
+def due_stages_epoch(now_epoch: int, drop_epoch: int) -> List[str]:
+    """
+    Same as due_stages, but takes integer POSIX timestamps.
+    Used in the per-sub loop to avoid datetime/timedelta arithmetic.
     """
     # If drop time already passed, no stages are due
-    if drop_dt <= now:
+    if drop_epoch <= now_epoch:
         return []
 
     # Calculate time difference in minutes
-    time_diff = drop_dt - now
-    min_left = int(time_diff.total_seconds() / 60)
+    min_left = (drop_epoch - now_epoch) // 60
+
+    # Too early for even the first stage
+    if min_left >= len(_STAGE_BY_MINUTE):
+        return []
+
+    # Most urgent stage whose threshold has been reached
+    return [_STAGE_BY_MINUTE[min_left]]
+
+@lru_cache(maxsize=4096)
+def _parse_drop_iso(drop_iso: str) -> Tuple[datetime, int]:
+    """
+    Parse a drop_iso string into (datetime, epoch seconds).
+    Cached since the same drops are re-checked on every scheduler tick.
+    """
+    drop_dt = datetime.fromisoformat(drop_iso)
+    return drop_dt, int(drop_dt.timestamp())
+
+@lru_cache(maxsize=4096)
+def _human_time(drop_iso: str) -> str:
+    """
+    Display string for a drop time (e.g. "Jan 15, 2025 10:00 AM").
+    Cached because it's a property of the drop and strftime is slow. Keyed on the
+    drop_iso string: aware datetimes hash by UTC instant, so the same instant
+    written with different offsets would share one (wrong) cached display.
+    """
+    return _parse_drop_iso(drop_iso)[0].strftime('%b %d, %Y %I:%M %p')
+
+def index_drops(drops: List[Dict[str, str]]) -> Dict[str, Tuple[Dict[str, str], Optional[datetime], int]]:
+    """
+    Build a drop_id lookup with each drop's datetime parsed up front.
+
+    Returns:
+        Dict of drop_id -> (drop, drop_dt, drop_epoch). drop_dt is None
+        (and drop_epoch 0) if the drop's drop_iso couldn't be parsed.
+    """
+    index = {}
+    for drop in drops:
+        try:
+            drop_dt, drop_epoch = _parse_drop_iso(drop['drop_iso'])
+            index[drop['drop_id']] = (drop, drop_dt, drop_epoch)
+        except (ValueError, KeyError, TypeError):
+            index[drop['drop_id']] = (drop, None, 0)
+    return index
+
+def build_drop_senders(drops_dict: Dict[str, Tuple[Dict[str, str], Optional[datetime], int]],
+                       drop_ids: Iterable[str],
+                       send_fn: Callable[..., Any]) -> Dict[str, Callable[..., Any]]:
+    """
+    Pre-bind each drop's static details onto send_fn.
+    Name, brand, display time and url don't change between stages, so they're
+    resolved once per drop and each send only passes webhook_url, minutes_left and stage.
+
+    Args:
+        drops_dict: Index from index_drops
+        drop_ids: Drops to build senders for (only ones with valid drop times)
+        send_fn: Notification function (send_reminder / send_reminder_async)
+
+    Returns:
+        Dict of drop_id -> specialized sender
+    """
+    senders = {}
+    for drop_id in drop_ids:
+        drop = drops_dict[drop_id][0]
 
-    # Determine due stages
-    due = []
+        # Format drop time for display
+        try:
+            drop_time_str = _human_time(drop['drop_iso'])
+        except ValueError:
+            drop_time_str = drop['drop_iso']
 
-    # Check each stage with 1-minute windows
-    if 1440 <= min_left < 1441:  # 24 hours (1 day)
-        due.append("1440")
-    elif 60 <= min_left < 61:    # 1 hour
-        due.append("60")
-    elif 30 <= min_left < 31:    # 30 minutes
-        due.append("30")
-    elif 15 <= min_left < 16:    # 15 minutes
-        due.append("15")
-    elif 5 <= min_left < 6:      # 5 minutes
-        due.append("5")
+        senders[drop_id] = partial(
+            send_fn,
+            sneaker_name=drop.get('name', 'Unknown Sneaker'),
+            brand=drop.get('brand', 'Unknown Brand'),
+            drop_time=drop_time_str,
+            url=drop.get('url', '')
+        )
+    return senders
 
-    return due
+def _reminder_kwargs(**kwargs) -> Dict[str, Any]:
+    """
+    Stand-in send_fn for batch mode: returns the reminder's arguments instead of sending.
+    """
+    return kwargs
+
+def _record_result(success: bool, reminders_sent: Dict[str, bool], stage: str, name: Optional[str], user: Optional[str]) -> bool:
+    """
+    Mark a stage as sent if the send succeeded, and log the outcome.
+
+    Returns:
+        True if reminders_sent was updated
+    """
+    if success:
+        reminders_sent[stage] = True
+        log.info("Sent %smin reminder for '%s' to %s", stage, name, user)
+        return True
+    log.warning("Failed to send %smin reminder for '%s'", stage, name)
+    return False
 
 def process_reminders(drops: List[Dict[str, str]], subs: List[Dict[str, Any]], 
                       config: Dict[str, Any], now: datetime, 
-                      send_fn: Callable[[str, str, str, str, int, str], bool]) -> Tuple[List[Dict[str, Any]], bool]:
+                      send_fn: Optional[Callable[..., Any]] = None,
+                      send_batch_fn: Optional[Callable[[List[Dict[str, Any]]], List[bool]]] = None,
+                      drops_by_id: Optional[Dict[str, Tuple[Dict[str, str], Optional[datetime], int]]] = None) -> Tuple[List[Dict[str, Any]], bool]:
     """
     Process all subscriptions and send due reminders.
     
@@ -65,90 +182,164 @@ def process_reminders(drops: List[Dict[str, str]], subs: List[Dict[str, Any]],
         subs: List of subscription dictionaries from JSON
         config: Configuration dict with webhook_url, etc.
         now: Current datetime for time calculations
-        send_fn: Function to call for sending notifications (send_reminder)
+        send_fn: Function to call for sending notifications (send_reminder).
+                 May also return a Future (send_reminder_async); queued sends
+                 run in parallel and are collected once at the end of the pass.
+        send_batch_fn: Optional batch sender (send_reminder_batch). When given,
+                 send_fn is ignored and all due reminders are sent in one call
+                 at the end of the pass, as a list of send_reminder kwargs.
+        drops_by_id: Optional prebuilt index_drops(drops) lookup, so callers that
+                 already indexed the drops don't pay for it twice
     
     Returns:
         Tuple of (updated_subs, changed_flag)
-        - updated_subs: Modified subscriptions with sent flags updated
+        - updated_subs: The same subs list, with sent flags updated in place
         - changed_flag: True if any reminders were sent (for saving)
+
+    Raises:
+        ValueError: If neither send_fn nor send_batch_fn is given
     """
 
-    # Create lookup for drops by drop_id
-    drops_dict = {drop['drop_id']: drop for drop in drops}
+    if send_fn is None and send_batch_fn is None:
+        raise ValueError("process_reminders needs a send_fn or send_batch_fn")
+
+    # Nothing to do without both drops and subscriptions
+    if not drops or not subs:
+        return subs, False
+
+    # Create lookup for drops by drop_id, with drop times parsed once per pass
+    drops_dict = drops_by_id if drops_by_id is not None else index_drops(drops)
+    now_epoch = int(now.timestamp())
+
+    # Window test once per drop rather than once per sub - popular drops can
+    # have thousands of subs that would all repeat the same comparison
+    near_drops = {
+        drop_id for drop_id, (_, drop_dt, drop_epoch) in drops_dict.items()
+        if drop_dt is not None and _WINDOW_MIN < drop_epoch - now_epoch < _WINDOW_MAX
+    }
+    # In batch mode the "sender" just returns its kwargs for send_batch_fn
+    senders = build_drop_senders(drops_dict, near_drops, _reminder_kwargs if send_batch_fn else send_fn)
+    webhook_url = config.get('discord_webhook', '')
 
-    updated_subs = []
     changed = False
+    pending = []  # (future, reminders_sent, stage, drop name, user) for queued sends
+    batch = []    # (reminder kwargs, reminders_sent, stage, drop name, user) for send_batch_fn
  
     # Process each subscription
     for sub in subs:
         drop_id = sub.get('drop_id')
         user = sub.get('user')
-        reminders_sent = sub.get('reminders_sent', {})
     
         # Find the corresponding drop
-        drop = drops_dict.get(drop_id)
-        if not drop: 
-            print(f"Drop ID '{drop_id}' for user '{user}' not found in drops data.")
-            updated_subs.append(sub) # Keep subscription unchanged
-            continue 
+        entry = drops_dict.get(drop_id)
+        if not entry: 
+            log.warning("Drop ID '%s' for user '%s' not found in drops data.", drop_id, user)
+            continue # Keep subscription unchanged
+
+        drop, drop_dt, drop_epoch = entry
+        if drop_dt is None:
+            log.warning("Invalid drop_iso for drop ID '%s': %r", drop_id, drop.get('drop_iso'))
+            continue
 
-        # Parse drop datetime
-        try: 
-            drop_dt = datetime.fromisoformat(drop['drop_iso'])
-        except (ValueError, KeyError) as e:
-            print(f"Invalid drop_iso for drop ID '{drop_id}': {e}")
-            updated_subs.append(sub)
+        # Cheap check: skip drops that aren't near any reminder window
+        if drop_id not in near_drops:
             continue
 
         # Check which stages are due
-        due_stages_list = due_stages(now, drop_dt)
+        due_stages_list = due_stages_epoch(now_epoch, drop_epoch)
 
         if not due_stages_list:
             # No reminders due, keep subscriptions unchanged
-            updated_subs.append(sub)
             continue 
 
+        # Live dict on the sub, so marking stages sent updates it in place
+        reminders_sent = sub.setdefault('reminders_sent', {})
+
         # Send notifcations for due stages
         for stage in due_stages_list:
             if reminders_sent.get(stage, False):
-                print(f" Skipping {stage}min reminder for user '{user}' (already sent).")
+                log.debug("Skipping %smin reminder for user '%s' (already sent).", stage, user)
                 continue # Already sent this stage 
 
-            # Format drop time for display
-            try:
-                drop_time_str = drop_dt.strftime('%b %d, %Y %I:%M %p')
-            except:
-                drop_time_str = drop['drop_iso']
-
             # Calculate mins left for display
-            mins_left = int((drop_dt - now).total_seconds() / 60)
+            mins_left = (drop_epoch - now_epoch) // 60
 
             # Send the notif 
-            success = send_fn(
-                webhook_url=config.get('discord_webhook', ''),
-                sneaker_name=drop.get('name', 'Unknown Sneaker'),
-                brand=drop.get('brand', 'Unknown Brand'),
-                drop_time=drop_time_str,
+            result = senders[drop_id](
+                webhook_url=webhook_url,
                 minutes_left=mins_left,
-                url=drop.get('url', '')
+                stage=stage
             )
 
-            if success:
-                # Mark as sent
-                reminders_sent[stage] = True
-                changed = True
-                print(f"Sent {stage}min reminder for '{drop.get('name')}' to {user}")
+            if send_batch_fn is not None:
+                # Collected for one batched send after the loop
+                batch.append((result, reminders_sent, stage, drop.get('name'), user))
+            elif isinstance(result, Future):
+                # Queued in background, resolve after the loop
+                pending.append((result, reminders_sent, stage, drop.get('name'), user))
             else:
-                print(f"Failed to send {stage}min reminder for '{drop.get('name')}'")
+                changed |= _record_result(result, reminders_sent, stage, drop.get('name'), user)
 
-        # Update the subscription with new reminder status
-        updated_subs.append({
-            **sub,
-            'reminders_sent': reminders_sent
-        })
+    # Collect queued sends - reminders_sent dicts are the live ones on each sub
+    if pending:
+        _, not_done = wait([p[0] for p in pending], timeout=SEND_TIMEOUT)
+        # Cancel sends that never started so they can't go out after we've given up on them
+        for future in not_done:
+            future.cancel()
+        # The rest are already posting; record their real outcome rather than
+        # marking them failed (which would resend them next check)
+        wait([f for f in not_done if not f.cancelled()])
+        for future, sent, stage, name, user in pending:
+            if future.cancelled():
+                log.warning("Deferred %smin reminder for '%s' to the next check (send queue timed out)", stage, name)
+                continue
+            success = not future.exception() and future.result()
+            changed |= _record_result(success, sent, stage, name, user)
 
-    return updated_subs, changed
+    # Send everything collected for the batch sender in one go
+    if batch:
+        results = send_batch_fn([b[0] for b in batch])
+        for (_, sent, stage, name, user), success in zip(batch, results):
+            changed |= _record_result(success, sent, stage, name, user)
+
+    return subs, changed
     
+def next_reminder_time(drops: List[Dict[str, str]], subs: List[Dict[str, Any]], now: datetime,
+                       drops_by_id: Optional[Dict[str, Tuple[Dict[str, str], Optional[datetime], int]]] = None) -> Optional[datetime]:
+    """
+    Find when the next unsent reminder stage becomes due.
+    Lets the runner sleep until then instead of waking on a fixed interval.
+
+    Args:
+        drops_by_id: Optional prebuilt index_drops(drops) lookup
+
+    Returns:
+        Datetime (in now's timezone) of the next due stage, or None if nothing is pending
+    """
+    drops_dict = drops_by_id if drops_by_id is not None else index_drops(drops)
+    now_epoch = int(now.timestamp())
+    next_epoch = None
+
+    for sub in subs:
+        entry = drops_dict.get(sub.get('drop_id'))
+        if not entry or entry[1] is None:
+            continue
+        drop_epoch = entry[2]
+        reminders_sent = sub.get('reminders_sent', {})
+
+        # Stages in the order they come due; the first unsent future one is this sub's next
+        for minutes, stage in reversed(_STAGES_ASC):
+            # First second at which (drop_epoch - now) // 60 <= minutes
+            due_epoch = drop_epoch - (minutes + 1) * 60 + 1
+            if due_epoch > now_epoch and not reminders_sent.get(stage, False):
+                if next_epoch is None or due_epoch < next_epoch:
+                    next_epoch = due_epoch
+                break
+
+    if next_epoch is None:
+        return None
+    return datetime.fromtimestamp(next_epoch, tz=now.tzinfo)
+
 def get_current_time() -> datetime:
     """
     Get current time in target timezone.
@@ -215,15 +406,15 @@ def main():
     test_times = [
         now + timedelta(hours=25),    # T-1500 (no reminder due)
         now + timedelta(hours=24),    # T-1440 (24h reminder due)
-        now + timedelta(hours=2),     # T-120 (no reminder due)
+        now + timedelta(hours=2),     # T-120 (24h reminder still due if missed)
         now + timedelta(hours=1),     # T-60 (1h reminder due)
-        now + timedelta(minutes=35),  # T-35 (no reminder due)
+        now + timedelta(minutes=35),  # T-35 (1h reminder still due if missed)
         now + timedelta(minutes=30),  # T-30 (30min reminder due)
-        now + timedelta(minutes=20),  # T-20 (no reminder due)
+        now + timedelta(minutes=20),  # T-20 (30min reminder still due if missed)
         now + timedelta(minutes=15), # T-15 (15min reminder due)
-        now + timedelta(minutes=10),  # T-10 (no reminder due)
+        now + timedelta(minutes=10),  # T-10 (15min reminder still due if missed)
         now + timedelta(minutes=5),   # T-5 (5min reminder due)
-        now + timedelta(minutes=1),  # T-1 (no reminder due)
+        now + timedelta(minutes=1),  # T-1 (5min reminder still due if missed)
     ]
 
     for test_dt in test_times:
@@ -1,22 +1,50 @@
+import argparse
 import json 
+import logging
+import math
+import signal
+import threading
+from logging.handlers import MemoryHandler
 from pathlib import Path
 from datetime import datetime
-from zoneinfo import ZoneInfo
+from typing import Optional
 import sys
 
-# Add parent directory to path to import other modules
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+# Running as a script: add the project root to the path so the bot package imports.
+# When imported as bot.run_reminders the package is already importable
+if __name__ == '__main__':
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from bot.storage import load_drops, load_subs, save_subs
-from bot.reminders import get_current_time, process_reminders, due_stages
-from bot.notify import send_reminder
+from bot.reminders import get_current_time, process_reminders, due_stages, next_reminder_time, index_drops, REMINDER_HORIZON_SECONDS
+from bot.notify import send_reminder_batch
 
 # Configuration file path
 CONFIG_FILE = Path(__file__).resolve().parent.parent / "config.json"
 
+# Last parsed config, reused while config.json's mtime is unchanged
+_config_cache = {"mtime": None, "data": None}
+
+# Buffers bot.* log records and writes them out once per check, so bursts of
+# reminder logs from the send threads don't each contend for stdout
+_LOG_TARGET = logging.StreamHandler(sys.stdout)
+_LOG_TARGET.setFormatter(logging.Formatter("%(message)s"))
+_LOG_HANDLER = MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=_LOG_TARGET)
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    Route the bot's reminder/notification logs to stdout through the buffered handler.
+    Use level=logging.DEBUG to also see skipped stages and per-request details.
+    """
+    logger = logging.getLogger("bot")
+    logger.setLevel(level)
+    if _LOG_HANDLER not in logger.handlers:
+        logger.addHandler(_LOG_HANDLER)
+
 def load_config() -> dict:
     """
     Load configruation from config.json file.
     Returns default config if file doesn't exist or has errors.
+    The parsed file is cached and only re-read when its mtime changes.
     """
     default_config = {
         "timezone": "America/Toronto",
@@ -31,30 +59,45 @@ def load_config() -> dict:
     
     # Try to load and parse config file
     try:
+        mtime = CONFIG_FILE.stat().st_mtime_ns
+        if mtime == _config_cache["mtime"]:
+            return _config_cache["data"]
+
         with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
             config = json.load(f)
+        _config_cache["mtime"] = mtime
+        _config_cache["data"] = config
         print(f"Loaded config from {CONFIG_FILE}")
         return config
     except Exception as e:
         print(f"Error loading config.json: {e}. Using default configuration.")
         return default_config
     
-def run_single_check():
+def run_single_check(config: Optional[dict] = None, now: Optional[datetime] = None):
     """
     Run a single reminder check: load data, process reminders, save if changed.
     Core function that does one complete pass of reminder system.
+
+    Args:
+        config: Already-loaded config (e.g. from the continuous loop); loaded if None
+        now: Time to check against (e.g. shared with the loop's scheduling); current time if None
+
+    Returns:
+        (drops, drops_by_id, subs) as used by the check, so the caller can schedule
+        the next one without reloading, or None if the check couldn't run
     """
     print("=== Sneaker Drop Reminder Check ===\n")
 
     # Load configuration 
-    config = load_config()
+    if config is None:
+        config = load_config()
     webhook_url = config.get("discord_webhook", "").strip()
 
     # If no webhook URL, abort
     if not webhook_url:
         print("No Discord webhook URL configured in config.json.")
         print("Add 'discord_webhook': 'your_webhook_url' to config.json to enable reminders.")
-        return False
+        return None
     
     # Load data
     drops = load_drops()
@@ -62,46 +105,87 @@ def run_single_check():
 
     if not drops: 
         print("No drops found. Please run scraper first.")  
-        return False
+        return None
     
     if not subs:
         print("No subscriptions found. use subscribe.py to add subscriptions.")
-        return False
+        return None
     
     print(f"Loaded {len(drops)} drops and {len(subs)} subscriptions.\n")
 
+    # drop_id lookup (with parsed drop times), built once for this check
+    drops_by_id = index_drops(drops)
+
     # Get current time
-    now = get_current_time()
+    if now is None:
+        now = get_current_time()
     print(f"Current time: {now.strftime('%Y-%m-%d %H:%M:%S %Z')}")
 
+    # Only subs whose drop is inside the reminder horizon can have a stage due.
+    # Unknown/unparseable drops are kept so process_reminders still warns about them
+    now_epoch = int(now.timestamp())
+    candidates = []
+    for sub in subs:
+        entry = drops_by_id.get(sub.get('drop_id'))
+        if entry is None or entry[1] is None or 0 < entry[2] - now_epoch < REMINDER_HORIZON_SECONDS:
+            candidates.append(sub)
+    print(f"{len(candidates)} of {len(subs)} subscriptions within the reminder window.")
+
     # Process reminders
     print("\nProcessing reminders...")
-    print("\nProcessing reminders...")
-    updated_subs, changed = process_reminders(
+    _, changed = process_reminders(
         drops=drops,
-        subs=subs,
+        subs=candidates,
         config=config,
         now=now,
-        send_fn=send_reminder
+        send_batch_fn=send_reminder_batch,
+        drops_by_id=drops_by_id
     )
+    _LOG_HANDLER.flush()  # Emit buffered reminder logs before the summary
 
-    # Save changes if ant reminders were sent 
+    # Save changes if ant reminders were sent (candidates are the same dicts as
+    # in subs and were updated in place, so save the full list)
     if changed:
-        save_subs(updated_subs)
+        save_subs(subs)
         print("\nSubscriptions updated with sent reminders.")
     else:
         print("\nNo reminders were due at this time.")
 
     print("\n✓ Reminder check complete.")
-    return True
+    return drops, drops_by_id, subs
+
+def seconds_until_next_check(max_interval_seconds: int, now: Optional[datetime] = None,
+                             checked: Optional[tuple] = None) -> int:
+    """
+    How long the loop can sleep: until the next reminder is due, capped at
+    max_interval_seconds so new drops/subscriptions still get picked up.
+
+    Args:
+        max_interval_seconds: Longest allowed sleep
+        now: The current tick's time; current time if None
+        checked: (drops, drops_by_id, subs) returned by run_single_check for this
+                 tick; drops and subs are loaded (and indexed) if None
+    """
+    if now is None:
+        now = get_current_time()
+    if checked is not None:
+        drops, drops_by_id, subs = checked
+    else:
+        drops, drops_by_id, subs = load_drops(), None, load_subs(shared=True)
+    next_due = next_reminder_time(drops, subs, now, drops_by_id=drops_by_id)
+    if next_due is None:
+        return max_interval_seconds
+    # Whole-second POSIX timestamps - no timedelta needed
+    return max(1, min(max_interval_seconds, math.ceil(next_due.timestamp() - now.timestamp())))
 
 def run_continuous_loop(check_interval_seconds: int = 60):
     """
     Run reminder checks continuously in a loop.
-    Checks every N seconds (default 60 seconds = 1 minute).
+    Sleeps until the next reminder is due, checking at least every N seconds
+    (default 60 seconds = 1 minute). Send SIGHUP to force an immediate recheck.
     
     Args:
-        check_interval_seconds: How often to check for reminders (default 60s)
+        check_interval_seconds: Longest time between checks (default 60s)
     
     Note: This is for demonstration. In production, you'd use:
     - Cron job: */1 * * * * (every minute)
@@ -109,18 +193,26 @@ def run_continuous_loop(check_interval_seconds: int = 60):
     - Task scheduler
     - Or run this script in background with nohup
     """
-    print(f"=== Continuous Reminder Loop (every {check_interval_seconds}s) ===")
+    print(f"=== Continuous Reminder Loop (at most every {check_interval_seconds}s) ===")
     print("Press Ctrl+C to stop\n")
-    
-    import time
+
+    # Event lets SIGHUP cut a sleep short (e.g. after editing subscriptions)
+    wake = threading.Event()
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: wake.set())
 
     try:
         while True:
-            print(f"\n--- Check at {datetime.now().strftime('%H:%M:%S')} ---")
-            run_single_check()
+            # One clock read per tick, shared by the check and the scheduling
+            now = get_current_time()
+            print(f"\n--- Check at {now.strftime('%H:%M:%S')} ---")
+            checked = run_single_check(load_config(), now)
             
-            print(f"Waiting {check_interval_seconds} seconds until next check...")
-            time.sleep(check_interval_seconds)
+            # Reuse the check's drops, index and (updated) subs to find the next due reminder
+            sleep_for = seconds_until_next_check(check_interval_seconds, now, checked)
+            print(f"Waiting {sleep_for} seconds until next check...")
+            wake.wait(sleep_for)
+            wake.clear()
     
     except KeyboardInterrupt:
         print("\n\n Stopped by user (Ctrl+C)")
@@ -136,7 +228,7 @@ def main():
     print("=== Sneaker Drop Reminder Bot ===\n")
     
     # Run single check
-    success = run_single_check()
+    success = run_single_check() is not None
     
     if not success:
         print("\n Reminder check failed")
@@ -167,26 +259,30 @@ def main():
     print()
     print("✓ Setup complete!")
 
-if __name__ == '__main__':
-    import sys
-    
-    # Handle command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--loop':
-            # Continuous loop mode
-            interval = 60  # default
-            if len(sys.argv) > 2:
-                try:
-                    interval = int(sys.argv[2])
-                except ValueError:
-                    print(" Invalid interval, using 60 seconds")
-            
-            run_continuous_loop(interval)
-        else:
-            print(" Unknown argument. Use --loop [seconds] for continuous mode")
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+    --loop alone runs every 60 seconds, --loop N every N seconds.
+    """
+    parser = argparse.ArgumentParser(description="Send due sneaker drop reminders.")
+    parser.add_argument('--loop', type=int, nargs='?', const=60, metavar='SECONDS',
+                        help="run continuously, checking at most every SECONDS (default 60)")
+    return parser.parse_args(argv)
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Run in the mode selected by the parsed arguments.
+    """
+    if args.loop is not None:
+        # Continuous loop mode
+        run_continuous_loop(args.loop)
     else:
         # Single check mode (default)
         main()
+
+if __name__ == '__main__':
+    setup_logging()
+    run(parse_args())
     
             
 
@@ -1,20 +1,69 @@
 from os import link
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime
-from zoneinfo import ZoneInfo
 import re
+import importlib.util
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
 
-# Add parent directory to path to be able to import storage
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Running as a script: add the project root to the path so the bot package imports
+if __name__ == '__main__':
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from bot.storage import load_drops, save_drops
+from bot.tz import TARGET_TZ # Target timezone for all drops
+
+# Release pages to scrape (add more sources here)
+SNEAKER_NEWS_URL = "https://sneakernew.com/release-dates/"
+SOURCE_URLS = (SNEAKER_NEWS_URL,)
+
+# Shared session so repeated scrapes reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-agent': 'Mozilla/5.0 (Macintosh; Intel OS x 10_15_7) AppleWebkit/537.36' 
+})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# lxml (C, libxml2) parses much faster than the pure-Python html.parser;
+# use it when it's installed
+_HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+# Only build the parts of the page that can hold release cards. Filtered on tag
+# name only: at parse time a class_ filter sees the raw class string, so cards
+# with several classes (class="release-card featured") would be dropped
+_CARD_STRAINER = SoupStrainer(['article', 'div'])
+
+# Name keyword -> brand (I picked my favourite(s))
+_BRAND_MAP = {
+    'jordan': "Nike",
+    'nike': "Nike",
+    'adidas': "Adidas",
+    'yeezy': "Adidas",
+    'new balance': "New Balance",
+    'puma': "Puma",
+    'asics': "ASICS",
+}
+# All keywords in one alternation, so each name is scanned once
+_BRAND_RE = re.compile('(' + '|'.join(re.escape(k) for k in _BRAND_MAP) + ')', re.IGNORECASE)
 
-# Target timezone for all drops
-TARGET_TZ = ZoneInfo("America/Toronto")
+# Compiled once at import - used for every scraped card
+_SLUG_RE1 = re.compile(r'[^\w\s-]')  # Special chars
+_SLUG_RE2 = re.compile(r'[-\s]+')     # Runs of spaces/dashes
+
+# Date formats tried by parse_drop_date (adjust based on actual site formats)
+_DATE_FORMATS = (
+    "%B %d, %Y",           # "January 15, 2025"
+    "%b %d, %Y",           # "Jan 15, 2025"
+    "%Y-%m-%d",            # "2025-01-15"
+    "%m/%d/%Y",            # "01/15/2025"
+    "%B %d, %Y %I:%M %p", # "January 15, 2025 10:00 AM"
+)
 
 # Convert sneaker names to clean IDs (e.g, "Air Jordan 1" -> "air_jordan-1")
+@lru_cache(maxsize=4096)
 def slugify(text):
     """
     Convert text to a URL-friendly slug (lowercase, spaces to dashes, alphanumerica only).
@@ -22,8 +71,8 @@ def slugify(text):
     """
     # Lowercase and trim whitespace
     text = text.lower().strip()
-    text = re.sub(r'[^\w\s-]','', text) # Remove special chars
-    text = re.sub(r'[-\s]+', '-', text)   # Replace spaces/dashes with single dash
+    text = _SLUG_RE1.sub('', text) # Remove special chars
+    text = _SLUG_RE2.sub('-', text)  # Replace spaces/dashes with single dash
     return text 
 
 def parse_drop_date(date_str):
@@ -31,23 +80,23 @@ def parse_drop_date(date_str):
     Parse various date formats and convert to ISO string in America/Toronto timezone
     Returns ISO format string or None if parsing fails.
     """
-    try: # Try common formats (adjust based on actual site formats)
-        formats = [
-            "%B %d, %Y",           # "January 15, 2025"
-            "%b %d, %Y",           # "Jan 15, 2025"
-            "%Y-%m-%d",            # "2025-01-15"
-            "%m/%d/%Y",            # "01/15/2025"
-            "%B %d, %Y %I:%M %p", # "January 15, 2025 10:00 AM"
-        ]
+    try: # Try common formats
+        date_str = date_str.strip()
+
+        # Fast path: ISO dates ("2025-01-15", "2025-01-15T10:00:00-05:00") skip strptime
+        try:
+            parse_dt = datetime.fromisoformat(date_str)
+        except ValueError:
+            parse_dt = None
 
         # Attempt to parse with each format 
-        parse_dt = None
-        for fmt in formats:
-            try:
-                parse_dt = datetime.strptime(date_str.strip(), fmt) 
-                break
-            except ValueError: # Try next format 
-                continue
+        if parse_dt is None:
+            for fmt in _DATE_FORMATS:
+                try:
+                    parse_dt = datetime.strptime(date_str, fmt) 
+                    break
+                except ValueError: # Try next format 
+                    continue
 
         # If still none, try to extract date with regex (e.g., "Jan 15th, 2025")
         if parse_dt:
@@ -55,8 +104,11 @@ def parse_drop_date(date_str):
             if parse_dt.hour == 0 and parse_dt.minute == 0:
                 parse_dt = parse_dt.replace(hour=10, minute=0)
 
-            # Localize to target timezone
-            localized = parse_dt.replace(tzinfo=TARGET_TZ)
+            # Localize to target timezone (convert if the string had its own offset)
+            if parse_dt.tzinfo is None:
+                localized = parse_dt.replace(tzinfo=TARGET_TZ)
+            else:
+                localized = parse_dt.astimezone(TARGET_TZ)
             return localized.isoformat()
         
         # Regex fallback 
@@ -65,104 +117,110 @@ def parse_drop_date(date_str):
         print(f"Data parsing error for '{date_str}' {e}")
         return None
 
-def scrape_sneaker_news():
+def scrape_sneaker_news(url: str = SNEAKER_NEWS_URL):
     """
     Scrape upcoming sneaker releases from SneakerNews.
     Returns list of drop dictionaries.
     Defensive: skips entries if selectors fail.
     """
-    url = "https://sneakernew.com/release-dates/"
-    drops = []
-
     # Fetch the SneakerNews release page
     try: 
         print(f"Fetching: {url}")
-        headers = {
-            'User-agent': 'Mozilla/5.0 (Macintosh; Intel OS x 10_15_7) AppleWebkit/537.36' 
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = _SESSION.get(url, timeout=10)
         response.raise_for_status()
-        # Parse HTML content 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Find release cards (adjust selectors based on site structure)
-        # Example structure: actual selectors may look different
-        release_cards = soup.find_all('article', class_='release-card') or \
-                        soup.find_all('div', class_='release-item') or \
-                        soup.find_all('div', class_='post')
-        
-        # Handle case of no cards found
-        if not release_cards:
-            print("No release cards found. Site structure may have changed.")
-            return drops
-        
-        print(f"Found {len(release_cards)} potential releases")
-
-        for card in release_cards[:20]: # Limit to 20 most recent
-            try: 
-                # Extract name - try multi sectores
-                name_elem = card.find('h2') or card.find('h3') or card.find('a', class_='title')
-                name = name_elem.get_text(strip=True) if name_elem else None
-
-                # Extract brand (in the name or seperate field)
-                brand = "Unkown"
-                # I picked my favourite(s)
-                if name:
-                    if 'jordan' in name.lower() or 'nike' in name.lower():
-                        brand = "Nike"
-                    elif 'addidas' in name.lower():
-                        brand = "Adidas"
-                    elif 'new balance' in name.lower():
-                        brand = "New Balance"
-
-                # Extract date
-                date_elem = card.find('time') or card.find('span', class_='date')
-                date_str = date_elem.get_text(strip=True) if date_elem else None 
-
-                # Extract URL
-                link_elem = card.find('a', href=True)
-                url_link = link.elim['href'] if link_elem else None
-                if url_link and not url_link.startswitj('http'):
-                    url_link = f"https://sneakernews.come({url_link})" 
-                
-                # Validate have min required data
-                if not name or not date_str:
-                    print(f"Skipping cinomlete entry:L name={name}, date={date_str}")
-                    continue
+        return parse_release_page(response.content)
+    except requests.RequestException as e:
+        print(f"Network error: {e}")
+        return []
+    except Exception as e:
+        print(f"Scraping error: {e}")
+        return []
 
-                # Prase data to ISO format 
-                drop_iso = parse_drop_date(date_str)
-                if not drop_iso:
-                    print(f"Skipping '{name}': couldn't parse data '{date_str}'")
-                    continue
+def scrape_all(urls=SOURCE_URLS):
+    """
+    Scrape every source page concurrently and combine the results.
+    Total time is roughly the slowest source rather than the sum of all of them.
+    """
+    with ThreadPoolExecutor(max_workers=min(8, len(urls) or 1)) as executor:
+        results = executor.map(scrape_sneaker_news, urls)
+    return [drop for drops in results for drop in drops]
 
-                # Create determinisitc drop_id
-                drop_id = f"{slugify(name)}-{drop_iso[:10]}" # name-slug + date (YYYY-MM-DD)
+def parse_release_page(content: bytes):
+    """
+    Extract drop dictionaries from a release page's HTML.
+    """
+    drops = []
+
+    # Parse HTML content (raw bytes so the parser handles encoding detection)
+    soup = BeautifulSoup(content, _HTML_PARSER, parse_only=_CARD_STRAINER)
+
+    # Find release cards (adjust selectors based on site structure)
+    # Example structure: actual selectors may look different
+    release_cards = soup.find_all('article', class_='release-card') or \
+                    soup.find_all('div', class_='release-item') or \
+                    soup.find_all('div', class_='post')
+    
+    # Handle case of no cards found
+    if not release_cards:
+        print("No release cards found. Site structure may have changed.")
+        return drops
+    
+    print(f"Found {len(release_cards)} potential releases")
+
+    for card in release_cards[:20]: # Limit to 20 most recent
+        try: 
+            # Extract name - try multi sectores
+            name_elem = card.find('h2') or card.find('h3') or card.find('a', class_='title')
+            name = name_elem.get_text(strip=True) if name_elem else None
 
-                drop_data = {
-                    "drop_id": drop_id,
-                    "name": name,
-                    "brand": brand,
-                    "drop_iso": drop_iso,
-                    "url": url_link or ""
-                }
+            # Extract brand (in the name or seperate field)
+            brand = "Unknown"
+            match = _BRAND_RE.search(name) if name else None
+            if match:
+                brand = _BRAND_MAP[match.group(1).lower()]
 
-                # Append to results
-                drops.append(drop_data)
-                print(f" Scrapped: {name} ({drop_iso[:10]})")
+            # Extract date
+            date_elem = card.find('time') or card.find('span', class_='date')
+            date_str = date_elem.get_text(strip=True) if date_elem else None 
 
-            except Exception as e:
-                print(f"Error parsing card: {e}")
+            # Extract URL
+            link_elem = card.find('a', href=True)
+            url_link = link.elim['href'] if link_elem else None
+            if url_link and not url_link.startswitj('http'):
+                url_link = f"https://sneakernews.come({url_link})" 
+            
+            # Validate have min required data
+            if not name or not date_str:
+                print(f"Skipping cinomlete entry:L name={name}, date={date_str}")
                 continue
-        # Final log 
-        print(f"\n Successfully scraped {len(drops)} drops")
-        return drops
-    except requests.RequestException as e:
-        print(f"Network error: {e}")
-        return drops
-    except Exception as e:
-        print(f"Scraping error: {e}")
-        return drops
+
+            # Prase data to ISO format 
+            drop_iso = parse_drop_date(date_str)
+            if not drop_iso:
+                print(f"Skipping '{name}': couldn't parse data '{date_str}'")
+                continue
+
+            # Create determinisitc drop_id
+            drop_id = f"{slugify(name)}-{drop_iso[:10]}" # name-slug + date (YYYY-MM-DD)
+
+            drop_data = {
+                "drop_id": drop_id,
+                "name": name,
+                "brand": brand,
+                "drop_iso": drop_iso,
+                "url": url_link or ""
+            }
+
+            # Append to results
+            drops.append(drop_data)
+            print(f" Scrapped: {name} ({drop_iso[:10]})")
+
+        except Exception as e:
+            print(f"Error parsing card: {e}")
+            continue
+    # Final log 
+    print(f"\n Successfully scraped {len(drops)} drops")
+    return drops
     
 # Combine new drops with existing, avoiding duplicates 
 def merge_drops(existing, new_drops):
@@ -170,9 +228,8 @@ def merge_drops(existing, new_drops):
     Merge new drops with existing ones, avoiding duplicates based on drop_id.
     Updates existing entries if found, adds new ones otherwise.
     """
-    # Create a set of existing drop_ids for quick lookup
-    existing_ids = {drop['drop_id'] for drop in existing}
-    merged = existing.copy()
+    # Key drops by drop_id so updates and inserts are O(1) (dicts keep insertion order)
+    merged = {drop['drop_id']: drop for drop in existing}
 
     # Counters for logging
     new_count = 0
@@ -180,20 +237,14 @@ def merge_drops(existing, new_drops):
 
     # Process each new drop
     for new_drop in new_drops:
-        if new_drop['drop_id'] in existing_ids:
-            # Update existing entry
-            for i, drop in enumerate(merged): # Find by drop_id 
-                if drop['drop_id'] == new_drop['drop_id']: 
-                    merged[i] = new_drop
-                    updated_count += 1
-                    break
+        if new_drop['drop_id'] in merged:
+            updated_count += 1 # Update existing entry in place
         else:
-            # Add new entry
-            merged.append(new_drop)
-            new_count += 1
+            new_count += 1 # Add new entry
+        merged[new_drop['drop_id']] = new_drop
     
     print(f"Merge complete: {new_count} new, {updated_count} updated")
-    return merged
+    return list(merged.values())
 
 # Orchestrates workflow: load existing drops, scrape new ones, merge, save 
 def main():
@@ -206,8 +257,8 @@ def main():
     existing_drops = load_drops()
     print(f"Existing drops in database: {len(existing_drops)}\n")
 
-    # Scrape new drops
-    new_drops = scrape_sneaker_news()
+    # Scrape new drops from every source
+    new_drops = scrape_all()
     
     # Check if any new drops were scraped 
     if not new_drops:
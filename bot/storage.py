@@ -1,27 +1,81 @@
 import csv
+import hashlib
+import io
 import json 
+import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+# orjson is a much faster JSON parser/encoder; fall back to stdlib json if missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Get project root directory
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 # Define file paths for data storage 
 DROPS_FILE = PROJECT_ROOT / "drops.csv" # CSV file to store sneaker drop info 
+DROPS_HASH_FILE = PROJECT_ROOT / "drops.csv.hash" # "<mtime> <hash>" of the last saved CSV, used to skip no-op writes
 SUBS_FILE = PROJECT_ROOT / "subscriptions.json" # JSON file to store user subscription
 
+# (mtime, hash) of the subscriptions file as last written by this process, used to skip no-op writes
+_last_subs_hash: Optional[Tuple[int, bytes]] = None
+
+# Parsed file contents keyed by path, reused while the file's mtime is unchanged
+# so polling loops don't re-read and re-parse files that haven't been touched
+_CACHE: Dict[Path, Tuple[int, Any]] = {}
+
+def _get_cached(path: Path, mtime: int) -> Optional[Any]:
+    """
+    Return the cached parse of path if it was loaded at this mtime, else None.
+    """
+    entry = _CACHE.get(path)
+    if entry and entry[0] == mtime:
+        return entry[1]
+    return None
+
+def _json_loads(data: bytes) -> Any:
+    """
+    Parse JSON bytes with orjson when available.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps_pretty(obj: Any) -> bytes:
+    """
+    Encode obj as 2-space indented JSON bytes (with trailing newline) with orjson when available.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, indent=2) + "\n").encode('utf-8')
+
 def load_drops() -> List[Dict[str, str]]:
     """
     Load sneaker drops from CSV file.
     Returns a list of dictionaries, each containing drop information.
     If file doesn't exist or has errors, returns empty list.
+    Unchanged files are served from memory; the list is a fresh copy but the
+    drop dicts are shared, so don't modify them in place.
     """
     drops = []
     if DROPS_FILE.exists(): # Check if CSV file exists 
         try: 
+            # Reuse the last parse if the file hasn't changed
+            mtime = DROPS_FILE.stat().st_mtime_ns
+            cached = _get_cached(DROPS_FILE, mtime)
+            if cached is not None:
+                return list(cached) # Copy so callers can't reorder/extend the cache
+
             # Open CSV file and read all rows into a list of dictionaries 
             with open(DROPS_FILE, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f) # Creates a reader that maps each row to a dict
-                drops = list(reader) # Convert reader to list of dictionaries 
+                reader = csv.reader(f)
+                header = next(reader, None) # First row holds the column names
+                # Zip each row onto the header - cheaper than DictReader's per-row bookkeeping
+                drops = [dict(zip(header, row)) for row in reader if row] if header else []
+            _CACHE[DROPS_FILE] = (mtime, drops)
+            drops = list(drops)
             print(f"Loaded {len(drops)} drops from CSV")
         except Exception as e:
             # If anything goes wrong (file corruption, permission issues, etc.)
@@ -30,35 +84,106 @@ def load_drops() -> List[Dict[str, str]]:
         print("No drops file found, starting with empty list")
     return drops
 
+def iter_drops() -> Iterator[Dict[str, str]]:
+    """
+    Yield sneaker drops one at a time without building the whole list.
+    For read-only passes (e.g. listing) over large catalogs. Served from the
+    load_drops cache when it's current, otherwise streamed row by row from the CSV.
+    Yields nothing if the file doesn't exist or can't be read.
+    """
+    if not DROPS_FILE.exists():
+        return
+    try:
+        cached = _get_cached(DROPS_FILE, DROPS_FILE.stat().st_mtime_ns)
+        if cached is not None:
+            yield from cached
+            return
+
+        with open(DROPS_FILE, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, None) # First row holds the column names
+            if header:
+                for row in reader:
+                    if row:
+                        yield dict(zip(header, row))
+    except Exception as e:
+        print(f"Error reading drops: {e}")
+
 def save_drops(drops: List[Dict[str, str]]) -> None:
     """
     Save sneaker drops to CSV file.
     Takes a list of dictionaries and writes them to CSV format.
     Creates the file if it doesn't exist.
+    Skips the write if the content is unchanged (compared via a hash sidecar
+    file that also records the mtime it was written at, so hand edits to drops.csv
+    aren't mistaken for our last save) and otherwise replaces the file atomically
+    so readers never see a partial CSV.
     """
     try: 
-        with open(DROPS_FILE, 'w', newline='', encoding='utf-8') as f:
-            if drops: # Only write if we have data
-                # Use keys from first dictionary as column headers 
-                writer = csv.DictWriter(f, fieldnames=drops[0].keys())
-                writer.writeheader() # Write column names as first row
-                writer.writerows(drops) # Write all data rows
+        # Build the CSV in memory first so it can be hashed
+        buf = io.StringIO(newline='')
+        if drops: # Only write if we have data
+            # Use keys from first dictionary as column headers 
+            fieldnames = tuple(drops[0].keys())
+            writer = csv.writer(buf)
+            writer.writerow(fieldnames) # Write column names as first row
+            # Stream rows positionally - no intermediate list, no DictWriter per-row key checks
+            writer.writerows(tuple(d.get(k, "") for k in fieldnames) for d in drops)
+        data = buf.getvalue().encode('utf-8')
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+        # Unchanged since the last save, and nobody replaced the file since - leave it (and its mtime) alone
+        if DROPS_FILE.exists() and DROPS_HASH_FILE.exists():
+            if DROPS_HASH_FILE.read_text() == f"{DROPS_FILE.stat().st_mtime_ns} {digest}":
+                print(f"Drops unchanged, skipped saving {len(drops)} drops")
+                return
+
+        # Write to a temp file and swap it in
+        tmp = DROPS_FILE.with_suffix('.csv.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, DROPS_FILE)
+        mtime = DROPS_FILE.stat().st_mtime_ns
+        DROPS_HASH_FILE.write_text(f"{mtime} {digest}")
+
+        # Prime the cache with what we just wrote so the next load skips the re-parse
+        _CACHE[DROPS_FILE] = (mtime, [dict(d) for d in drops])
         print(f"Saved {len(drops)} drops to CSV")
     except Exception as e:
         print(f"Error saving drops: {e}")
 
-def load_subs() -> List[Dict[str, Any]]:
+def load_subs(shared: bool = False) -> List[Dict[str, Any]]:
     """
     Load user subscriptions from JSON file.
     Returns a list of subscription dictionaries.
     Each subscription tracks which drops a user wants reminders for. 
+    Unchanged files are re-parsed from cached bytes (no disk read), so callers get
+    their own objects and are free to mutate them.
+
+    Args:
+        shared: Return one cached parse instead of a fresh one. Cheaper for
+                read-only callers (listing, scheduling), which must not modify it.
     """
     subs = []
     if SUBS_FILE.exists(): # Check if JSON file exists
         try:
+            # Reuse the file's bytes if it hasn't changed. Subs get their reminders_sent
+            # flags mutated by callers, so each caller gets a fresh parse - parsing the
+            # bytes again is much cheaper than deep-copying a cached list
+            mtime = SUBS_FILE.stat().st_mtime_ns
+            cached = _get_cached(SUBS_FILE, mtime)
+            if cached is not None:
+                if not shared:
+                    return _json_loads(cached["raw"])
+                if cached["parsed"] is None:
+                    cached["parsed"] = _json_loads(cached["raw"])
+                return cached["parsed"]
+
             # Open JSON file and parse it into Python objects
-            with open(SUBS_FILE, 'r', encoding='utf-8') as f:
-                subs = json.load(f) # JSON to Python list/dict
+            with open(SUBS_FILE, 'rb') as f:
+                raw = f.read()
+            subs = _json_loads(raw) # JSON to Python list/dict
+            # Only keep the parse for shared callers; anyone else now owns subs
+            _CACHE[SUBS_FILE] = (mtime, {"raw": raw, "parsed": subs if shared else None})
             print(f"Loaded {len(subs)} subscriptions")
         except Exception as e:
             # Handle JSON parsing errors 
@@ -71,11 +196,34 @@ def save_subs(subs: List[Dict[str, Any]]) -> None:
     """
     Save user subscriptions to JSON file.
     Takes a list of subscription dictionaries and writes them as formatted JSON
+    Skips the write if the bytes match the last save and otherwise replaces the
+    file atomically, so a crash mid-write can't leave a truncated subscriptions.json.
     """
+    global _last_subs_hash
     try: 
-        with open(SUBS_FILE, 'w', encoding='utf-8') as f:
-            # Write JSON with nice formatting 
-            json.dump(subs, f, indent=2)
+        # Write JSON with nice formatting 
+        data = _json_dumps_pretty(subs)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+
+        # Unchanged since our last save (and nobody replaced the file since) - skip it
+        if (_last_subs_hash and _last_subs_hash[1] == digest and SUBS_FILE.exists()
+                and SUBS_FILE.stat().st_mtime_ns == _last_subs_hash[0]):
+            print(f"Subscriptions unchanged, skipped saving {len(subs)} subscriptions")
+            return
+
+        # Write to a temp file and swap it in
+        tmp = SUBS_FILE.with_suffix('.json.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno()) # Make sure the bytes are on disk before the rename
+        os.replace(tmp, SUBS_FILE)
+        mtime = SUBS_FILE.stat().st_mtime_ns
+        _last_subs_hash = (mtime, digest)
+
+        # Prime the cache with what we just wrote so the next load skips the re-parse
+        # (bytes only - the caller still owns subs, and load_subs re-parses on demand)
+        _CACHE[SUBS_FILE] = (mtime, {"raw": data, "parsed": None})
         print(f"Saved {len(subs)} subscriptions")
     except Exception as e:
         print(f"Error saving subscriptions: {e}")
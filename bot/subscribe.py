@@ -1,97 +1,238 @@
 from pathlib import Path
+import atexit
+import os
 import sys
+from contextlib import contextmanager
 from datetime import datetime
-from zoneinfo import ZoneInfo
+from functools import lru_cache
+from operator import itemgetter
 
-# Add parent directory to path so we can import storage
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from bot.storage import load_drops, save_drops, load_subs, save_subs
+# Running as a script: add the project root to the path so the bot package imports.
+# When imported as bot.subscribe (or run with python -m) the package is already importable
+if __name__ == '__main__':
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bot.storage import load_drops, iter_drops, save_drops, load_subs, save_subs
+from bot.reminders import STAGES
+
+# Drop columns shown by list_drops_text, and a getter pulling them in one call
+_DROP_COLUMNS = ('drop_id', 'name', 'brand', 'drop_iso')
+_get_drop_columns = itemgetter(*_DROP_COLUMNS)
+
+# Fresh reminders_sent for a new subscription: every stage in STAGES unsent.
+# Built once and shallow-copied per subscription
+_REMINDER_TEMPLATE = dict.fromkeys(STAGES, False)
+
+# Reminder status text indexed by the sent flag, and the label shown for each stage
+_STATUS = ("Pending", "Checked")
+
+def _stage_label(stage):
+    """
+    Display label for a reminder stage, e.g. "1440" -> "T-24h", "30" -> "T-30min".
+    """
+    hours, minutes = divmod(int(stage), 60)
+    return f"T-{hours}h" if hours and not minutes else f"T-{stage}min"
+
+_STAGE_LABELS = tuple((stage, _stage_label(stage)) for stage in STAGES)
+
+# Subscription changes not yet written to disk, as ("add" | "remove", drop_id, user).
+# Only the operations are kept, not a copy of the file, so flush_subs() replays
+# them onto a fresh load and doesn't clobber reminders_sent flags (or subs)
+# written by other processes in the meantime
+_pending_subs = []
+
+# How many subs_transaction() blocks are open. Outside of one, every change is saved immediately
+_batch_depth = 0
+
+def _apply_pending(subs):
+    """
+    Apply the pending add/remove operations to subs (in place) and return it.
+    """
+    for op, drop_id, user in _pending_subs:
+        if op == "add":
+            if not any(sub['drop_id'] == drop_id and sub['user'] == user for sub in subs):
+                subs.append({
+                    "drop_id": drop_id,
+                    "user": user,
+                    "reminders_sent": _REMINDER_TEMPLATE.copy()
+                })
+        else:
+            subs[:] = [sub for sub in subs if not (sub['drop_id'] == drop_id and sub['user'] == user)]
+    return subs
+
+def _get_subs(shared=False):
+    """
+    Current subscriptions, including changes still waiting for flush_subs().
+    shared=True may return the storage cache itself, so callers must not modify it.
+    """
+    if not _pending_subs:
+        return load_subs(shared=shared)
+    return _apply_pending(load_subs())
+
+def flush_subs():
+    """
+    Write any pending subscription changes to disk in a single save.
+    Reloads the file and replays the pending operations onto it first.
+    Returns True if anything was written.
+    """
+    if not _pending_subs:
+        return False
+    save_subs(_apply_pending(load_subs()))
+    _pending_subs.clear()
+    return True
 
-TARGET_TZ = ZoneInfo("America/Toronto") 
+@contextmanager
+def subs_transaction():
+    """
+    Batch subscription changes: adds/removes made inside the block are saved
+    together in one write when the (outermost) block exits, even on errors.
+
+    Usage:
+        with subs_transaction():
+            remove_subscription("a")
+            remove_subscription("b")
+    """
+    global _batch_depth
+    _batch_depth += 1
+    try:
+        yield
+    finally:
+        _batch_depth -= 1
+        if _batch_depth == 0:
+            flush_subs()
+
+def _queue_change(op, drop_id, user):
+    """
+    Record an add/remove, saving it right away unless a subs_transaction() is open.
+    """
+    _pending_subs.append((op, drop_id, user))
+    if _batch_depth == 0:
+        flush_subs()
+
+def _write_lines(lines):
+    """
+    Write lines to stdout as one pre-encoded buffer.
+    Goes straight to the file descriptor when there is one (terminal, file, pipe),
+    skipping the text layer; falls back to sys.stdout.write otherwise.
+    Encodes the way print() would (stdout's encoding and error handler), so
+    non-ASCII names still come out right on non-UTF-8 consoles.
+    """
+    text = "\n".join(lines) + "\n"
+    try:
+        fd = sys.stdout.fileno()
+        encoding = sys.stdout.encoding
+    except (AttributeError, OSError): # e.g. stdout replaced by a StringIO
+        fd = None
+    # The text layer also translates newlines where they aren't "\n" (Windows)
+    if fd is None or not encoding or os.linesep != "\n":
+        sys.stdout.write(text)
+        return
+    sys.stdout.flush() # Keep order with anything already print()ed
+    buf = memoryview(text.encode(encoding, getattr(sys.stdout, 'errors', None) or 'strict'))
+    while buf: # os.write may write less than asked (e.g. full pipe)
+        buf = buf[os.write(fd, buf):]
+
+# Display format for drop dates (e.g. "Jan 15, 2025 10:00 AM")
+_DISPLAY_FORMAT = "%b %d, %Y %I:%M %p"
+
+@lru_cache(maxsize=1024)
+def _fmt_iso(drop_iso):
+    """
+    Format an ISO date string for display (e.g. "Jan 15, 2025 10:00 AM").
+    Returns the raw string (truncated to 20 chars) if it can't be parsed.
+    Cached since listings re-render the same dates.
+    """
+    # Only try to parse things shaped like an ISO date ("YYYY-MM-DD...")
+    if len(drop_iso) >= 10 and drop_iso[4] == '-':
+        try:
+            dt = datetime.fromisoformat(drop_iso)
+            return dt.strftime(_DISPLAY_FORMAT)
+        except ValueError:
+            pass
+    return drop_iso[:20] # Use raw string if parsing fails
 
 def list_drops_text():
     """
     Load and display all available drops in user-friendly format.
     Shows drop_id, name, brand, and release date
     """
-    drops = load_drops() 
-    # If no drops found, inform 
-    if not drops:
-        return "No sneaker drops available at the moment. Run the scraper first!"
-    
-    # Print header 
-    print(f"\n Available Drops ({len(drops)} total):\n")
-    print(f"{'Drop ID':<8} {'Name':<35} {'Brand':<15} {'Release Date':<20}")
-    print("-" * 110) 
-
-    for drop in drops:
-        drop_id = drop.get('drop_id', 'N/A')[:38]   # Truncate long IDs
-        name = drop.get('name', 'N/A')[:33]         # Truncate long names 
-        brand = drop.get('brand', 'N/A')[:13]
-        drop_iso = drop.get('release_date', 'N/A')[:20]
-
-        # Format date 
+    # Build the whole table and write it once instead of printing row by row.
+    # Drops are streamed, so rows come first and the header is added once the count is known
+    rows = []
+    for drop in iter_drops():
         try:
-            dt = datetime.fromisoformat(drop_iso)
-            date_str = dt.strftime("%b %d, %Y %I:%M %p")
-        except:
-            date_str = drop_iso[:20] if drop_iso != 'N/A' else 'N/A' # Use raw string if parsing fails
+            fields = _get_drop_columns(drop)
+        except KeyError: # Row is missing a column
+            fields = tuple(drop.get(k) for k in _DROP_COLUMNS)
+        drop_id, name, brand, drop_iso = (v or 'N/A' for v in fields)
+
+        drop_id = drop_id[:38]   # Truncate long IDs
+        name = name[:33]         # Truncate long names 
+        brand = brand[:13]
 
-        print(f"{drop_id:<8} {name:<35} {brand:<15} {date_str:<20}")
+        # Format date (from the full string - truncating first would cut off the UTC offset)
+        date_str = _fmt_iso(drop_iso)
 
-    print()  
+        rows.append(" ".join((drop_id.ljust(8), name.ljust(35), brand.ljust(15), date_str.ljust(20))))
+
+    # If no drops found, inform 
+    if not rows:
+        return "No sneaker drops available at the moment. Run the scraper first!"
+
+    # Header 
+    lines = [
+        f"\n Available Drops ({len(rows)} total):\n",
+        f"{'Drop ID':<8} {'Name':<35} {'Brand':<15} {'Release Date':<20}",
+        "-" * 110,
+    ]
+    lines.extend(rows)
+    lines.append("")
+    _write_lines(lines)
 
 def add_subscription(drop_id, user="me"):
     """
     Subscribe to a drop_id for reminder notifications.
     Creates a subscription object tracking which reminders have been sent.
+    Saved immediately, or when the enclosing subs_transaction() exits.
     """ 
     # Load existing data
     drops = load_drops()
-    subs = load_subs()
+    subs = _get_subs(shared=True) # Only checked here; the add is queued below
+    drops_by_id = {d['drop_id']: d for d in drops} # drop_id lookup for validation and details
 
     # Validate that drop_id exists
-    drop_exists = any(drop['drop_id'] == drop_id for drop in drops)
+    drop_exists = drop_id in drops_by_id
     if not drop_exists:
         print(f"\n Error: Drop ID '{drop_id}' not found. Please check available drops.\n")
         print("Run list_drops_text() to see valid drop IDs.\n")
         return False
     
     # Check if already subscribed
-    for sub in subs:
-        if sub['drop_id'] == drop_id and sub['user'] == user:
-            print(f"\n You are already subscribed to drop ID '{drop_id}'.\n")
-            return False
+    existing = {(sub['drop_id'], sub['user']) for sub in subs}
+    if (drop_id, user) in existing:
+        print(f"\n You are already subscribed to drop ID '{drop_id}'.\n")
+        return False
         
-    # Create new subscription
-    new_sub = {
-        "drop_id": drop_id,
-        "user": user,
-        "reminders_sent": {
-            "1440": False,  # 24 hours before (1 day)
-            "60": False,    # 1 hour before
-            "30": False,    # 30 minutes before
-            "15": False,    # 15 minutes before
-            "5": False      # 5 minutes before
-        }
-    }
-    
-    subs.append(new_sub)
+    # Record the new subscription (created with fresh reminders_sent when saved)
+    _queue_change("add", drop_id, user)
     # Get drop details for confirmation
-    drop_name = next((d['name'] for d in drops if d['drop_id'] == drop_id), drop_id)
+    drop_name = drops_by_id[drop_id].get('name', drop_id)
     
     print(f"\n Subscribed to: {drop_name}")
     print(f"   Drop ID: {drop_id}")
     print(f"   You'll receive reminders at: T-30min, T-15min, T-5min\n")
     return True
 
-def list_subs_text():
+def list_subs_text(drops_dict=None, subs=None):
     """
     Display all current subscriptions with their reminder status.
     Shows which reminders have been sent for each drop.
+
+    Args:
+        drops_dict: Optional prebuilt drop_id -> drop lookup (built from load_drops() if None)
+        subs: Optional subscriptions to show (current subscriptions if None)
     """
-    subs = load_subs()
-    drops =load_drops()
+    if subs is None:
+        subs = _get_subs(shared=True) # Read-only, so skip the defensive copy
 
     # if not subscriptions found, inform 
     if not subs:
@@ -100,9 +241,11 @@ def list_subs_text():
         return 
     
     # Create lookup for drop details 
-    drops_dict = {drop['drop_id']: drop for drop in drops}
+    if drops_dict is None:
+        drops_dict = {drop['drop_id']: drop for drop in load_drops()}
 
-    print(f"Your subscriptions ({len(subs)} total):\n")
+    # Build the whole listing and write it once instead of printing line by line
+    lines = [f"Your subscriptions ({len(subs)} total):\n"]
 
     # Print header
     for i, sub in enumerate(subs,1):
@@ -114,56 +257,123 @@ def list_subs_text():
         drop = drops_dict.get(drop_id)
         if drop:
             name = drop.get('name', drop_id)[:30]  
-            drop_iso = drop.get('drop_iso', 'N/A')[:20] 
-            try:
-                dt = datetime.fromisoformat(drop_iso)
-                date_str = dt.strftime("%b %d, %Y %I:%M %p")
-            except:
-                date_str = drop_iso 
+            drop_iso = drop.get('drop_iso', 'N/A')
+            date_str = _fmt_iso(drop_iso)
     
         else: 
             name = drop_id
             date_str = 'N/A'
             
-        print(f"{i}. {name}")
-        print(f"   Drop ID: {drop_id}")
-        print(f"   Release Date: {date_str}")
-        print(f"   User: {user}")
+        lines.append(f"{i}. {name}")
+        lines.append(f"   Drop ID: {drop_id}")
+        lines.append(f"   Release Date: {date_str}")
+        lines.append(f"   User: {user}")
 
         # Show reminder status
-        sent_1440 = "Checked" if reminders.get("1440") else "Pending"
-        sent_60 = "Checked" if reminders.get("60") else "Pending"
-        sent_30 = "Checked" if reminders.get("30") else "Pending"
-        sent_15 = "Checked" if reminders.get("15") else "Pending"
-        sent_5 = "Checked" if reminders.get("5") else "Pending"
+        status = " ".join(f"[{label}: {_STATUS[bool(reminders.get(stage))]}]" for stage, label in _STAGE_LABELS)
+        lines.append(f"   Reminders Sent: {status}\n") 
+        lines.append("-" * 60) 
 
-        print(f"   Reminders Sent: [T-24h: {sent_1440}] [T-1h: {sent_60}] [T-30min: {sent_30}] [T-15min: {sent_15}] [T-5min: {sent_5}]\n") 
-        print("-" * 60) 
+    _write_lines(lines)
 
 def remove_subscription(drop_id, user="me"):
     """
     Unsubscribe from a drop_id.
     Return True if removed, False if not found.
+    Saved immediately, or when the enclosing subs_transaction() exits (so several
+    removals in one transaction cost one write).
     """
-    subs = load_subs()
-    initial_count = len(subs)
+    subs = _get_subs(shared=True) # Only checked here; the removal is queued below
 
-    # Filter out the subscription to be removed
-    subs = [sub for sub in subs if not (sub['drop_id'] == drop_id and sub['user'] == user)]
-
-    if len(subs) < initial_count:
-        save_subs(subs)
-        print(f"\n Unsubscribed from drop ID '{drop_id}'.\n")
-        return True
-    else:
+    # Nothing to remove - skip rebuilding and saving the list
+    existing = {(sub['drop_id'], sub['user']) for sub in subs}
+    if (drop_id, user) not in existing:
         print(f"\n No subscription found for drop ID '{drop_id}'.\n")
-        return False    
+        return False
+
+    # Filter out the subscription to be removed
+    _queue_change("remove", drop_id, user)
+    print(f"\n Unsubscribed from drop ID '{drop_id}'.\n")
+    return True
 
 def interactive_mode():
     """
     Interactive subscription management.
     Allows you to subscribe to drops through a simple menu.
     """
+    # Backstop: queued changes from this session still get saved at interpreter exit
+    atexit.register(flush_subs)
+    # Save everything changed during the session in one write (also on Ctrl+C)
+    with subs_transaction():
+        _menu_loop()
+
+def _menu_list_drops():
+    """
+    Menu 1: show all available drops.
+    """
+    print("\n--- AVAILABLE DROPS ---")
+    list_drops_text()
+
+def _menu_subscribe():
+    """
+    Menu 2: show drops, then subscribe to the one entered.
+    """
+    print("\n--- SUBSCRIBE TO A DROP ---")
+    list_drops_text()  # Show drops first
+    print("\n" + "-"*40)
+    drop_id = input("Enter the drop_id you want to subscribe to: ").strip()
+    if drop_id:
+        add_subscription(drop_id)
+    else:
+        print(" No drop_id entered")
+
+def _menu_list_subs():
+    """
+    Menu 3: show current subscriptions.
+    """
+    print("\n--- MY SUBSCRIPTIONS ---")
+    list_subs_text()
+
+def _menu_unsubscribe():
+    """
+    Menu 4: show subscriptions, then remove the one entered.
+    """
+    print("\n--- REMOVE SUBSCRIPTION ---")
+    list_subs_text()  # Show current subscriptions
+    print("\n" + "-"*40)
+    drop_id = input("Enter the drop_id to unsubscribe from: ").strip()
+    if drop_id:
+        remove_subscription(drop_id)
+    else:
+        print(" No drop_id entered")
+
+def _menu_exit():
+    """
+    Menu 5: save pending changes and leave the menu.
+    """
+    flush_subs()
+    print("\n👋 Goodbye! Happy sneaker hunting!")
+    return True # Stop the menu loop
+
+def _menu_invalid():
+    """
+    Anything else: ask again.
+    """
+    print(" Invalid choice, please try again")
+
+# Menu choice -> handler. Handlers return True to exit
+MENU_ACTIONS = {
+    "1": _menu_list_drops,
+    "2": _menu_subscribe,
+    "3": _menu_list_subs,
+    "4": _menu_unsubscribe,
+    "5": _menu_exit,
+}
+
+def _menu_loop():
+    """
+    Show the menu and handle choices until the user exits.
+    """
     while True:
         print("\n" + "="*50)
         print("🔔 SNEAKER DROP SUBSCRIPTION MANAGER")
@@ -177,40 +387,8 @@ def interactive_mode():
         
         choice = input("\nEnter your choice (1-5): ").strip()
         
-        if choice == "1":
-            print("\n--- AVAILABLE DROPS ---")
-            list_drops_text()
-        
-        elif choice == "2":
-            print("\n--- SUBSCRIBE TO A DROP ---")
-            list_drops_text()  # Show drops first
-            print("\n" + "-"*40)
-            drop_id = input("Enter the drop_id you want to subscribe to: ").strip()
-            if drop_id:
-                add_subscription(drop_id)
-            else:
-                print(" No drop_id entered")
-       
-        elif choice == "3":
-            print("\n--- MY SUBSCRIPTIONS ---")
-            list_subs_text()
-        
-        elif choice == "4":
-            print("\n--- REMOVE SUBSCRIPTION ---")
-            list_subs_text()  # Show current subscriptions
-            print("\n" + "-"*40)
-            drop_id = input("Enter the drop_id to unsubscribe from: ").strip()
-            if drop_id:
-                remove_subscription(drop_id)
-            else:
-                print(" No drop_id entered")
-        
-        elif choice == "5":
-            print("\n👋 Goodbye! Happy sneaker hunting!")
+        if MENU_ACTIONS.get(choice, _menu_invalid)():
             break
-        
-        else:
-            print(" Invalid choice, please try again")
 
 def main():
     """
@@ -0,0 +1,5 @@
+from zoneinfo import ZoneInfo
+
+# Target timezone for all drops, reminders and user-facing times.
+# Shared so every module uses the same tzinfo instance.
+TARGET_TZ = ZoneInfo("America/Toronto")
@@ -1,9 +1,21 @@
 import json, requests
 from pathlib import Path
 
+# orjson parses the raw bytes directly; fall back to stdlib json if missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 BASE = Path(__file__).resolve().parent
-cfg = json.loads((BASE / "config.json").read_text(encoding="utf-8"))
+raw = (BASE / "config.json").read_bytes()
+cfg = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-r = requests.post(cfg["discord_webhook"], json={"content": "🚨 Sneaker Bot Test Ping!"}, timeout=10)
+# Session keeps the connection open, so repeated pings skip the TCP/TLS handshake
+session = requests.Session()
+# Payload encoded to bytes once up front
+payload = {"content": "🚨 Sneaker Bot Test Ping!"}
+body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
+r = session.post(cfg["discord_webhook"], data=body, headers={"Content-Type": "application/json"}, timeout=10)
 print("Status:", r.status_code, "(204 means success)")
-print("Response:", r.text)
\ No newline at end of file
+print("Response:", r.text)